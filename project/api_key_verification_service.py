@@ -1,13 +1,80 @@
-from typing import Optional
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
 
 import prisma
-import prisma.models
-from pydantic import BaseModel
+from cachetools import TTLCache
 
+logger = logging.getLogger(__name__)
 
-class APIKeyVerificationResponse(BaseModel):
+# Successful lookups are cached in-process so repeated requests with the same
+# key skip the database. The TTL bounds how long a revoked key keeps working.
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "60"))
+
+# Keys that resolved to no user are remembered briefly so probe storms with the
+# same bad key collapse into a single query. Kept short so a freshly issued key
+# becomes usable almost immediately.
+API_KEY_NEGATIVE_CACHE_TTL = float(os.getenv("API_KEY_NEGATIVE_CACHE_TTL", "5"))
+
+# When issued keys follow a known shape (e.g. "ak_[A-Za-z0-9]{32}"), set this so
+# malformed keys are rejected before they reach the caches or the database.
+API_KEY_PATTERN = os.getenv("API_KEY_PATTERN")
+
+_key_re = re.compile(API_KEY_PATTERN) if API_KEY_PATTERN else None
+
+# Most keys one batch verification request may carry. Bounds the size of the
+# batch query and how much of the negative cache a single request can churn.
+API_KEY_BATCH_MAX = int(os.getenv("API_KEY_BATCH_MAX", "1000"))
+
+# When positive, the full digest -> user table is mirrored in memory and
+# reloaded every this many seconds, and verification never touches the
+# database. Revocations then take up to one interval to apply.
+API_KEY_INDEX_REFRESH_SECONDS = float(os.getenv("API_KEY_INDEX_REFRESH_SECONDS", "0"))
+
+# When positive, a Bloom filter of every key digest is rebuilt this often and
+# keys it rules out are rejected without a query. Much smaller than the full
+# index; newly issued keys are usable after the next rebuild.
+API_KEY_BLOOM_REFRESH_SECONDS = float(os.getenv("API_KEY_BLOOM_REFRESH_SECONDS", "0"))
+
+# Only the SHA-256 of each key is stored, under a unique index on fixed-width
+# "apiKeyHash". A raw query skips the ORM's model materialisation for what is a
+# two-column lookup.
+_USER_BY_API_KEY_QUERY = 'SELECT id, role FROM "User" WHERE "apiKeyHash" = $1 LIMIT 1'
+# The batch lookup projects the position of each digest in the parameter array
+# rather than echoing the 64-character digest back, so every returned row only
+# carries what the caller needs: an ordinal, id and role.
+_USERS_BY_API_KEYS_QUERY = (
+    'SELECT k.i::int AS i, u.id, u.role FROM unnest($1::bpchar[]) WITH ORDINALITY AS k(h, i) '
+    'JOIN "User" u ON u."apiKeyHash" = k.h'
+)
+_ALL_API_KEYS_QUERY = 'SELECT "apiKeyHash", id, role FROM "User"'
+_ALL_API_KEY_HASHES_QUERY = 'SELECT "apiKeyHash" FROM "User"'
+
+_key_cache: TTLCache = TTLCache(maxsize=10_000, ttl=API_KEY_CACHE_TTL)
+_neg_cache: TTLCache = TTLCache(maxsize=50_000, ttl=API_KEY_NEGATIVE_CACHE_TTL)
+
+# Lookups currently in flight, by key digest. Concurrent requests for the same
+# uncached key await the one query instead of each issuing their own.
+_inflight: dict[str, "asyncio.Task[APIKeyVerificationResponse]"] = {}
+
+# The in-memory mirror of all keys; None until it has been loaded once.
+_key_index: Optional[dict[str, "APIKeyVerificationResponse"]] = None
+
+# Bloom filter over all key digests; None until it has been built once.
+_key_bloom: Optional["_BloomFilter"] = None
+
+
+@dataclass(frozen=True, slots=True)
+class APIKeyVerificationResponse:
     """
     Outlines the response provided upon verifying an API key. It indicates whether the API key is valid and, if so, returns basic user information.
+
+    A plain slotted dataclass rather than a Pydantic model: it is only ever built from trusted database rows, so validation on construction is pure overhead. FastAPI still accepts it as a response model.
     """
 
     is_valid: bool
@@ -15,6 +82,56 @@ class APIKeyVerificationResponse(BaseModel):
     role: Optional[str] = None
 
 
+# Responses are immutable, so they can be shared between requests: every
+# rejected key gets this one, and verified keys reuse their cached response.
+_INVALID = APIKeyVerificationResponse(is_valid=False, user_id=None, role=None)
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hashes an API key into the hex digest stored in User.apiKeyHash.
+
+    The same digest keys the in-process caches, so raw secrets are never kept in memory.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def api_key_verification_cached(api_key: str) -> Optional[APIKeyVerificationResponse]:
+    """
+    Answers an API key verification from the in-process caches alone.
+
+    Args:
+        api_key (str): The API key provided by the user for verification.
+
+    Returns:
+        Optional[APIKeyVerificationResponse]: The cached verification result, or None if the key has to be looked up with api_key_verification.
+
+    Being synchronous, callers can try this first and skip creating and scheduling a coroutine on the common cache-hit path.
+    """
+    if not _well_formed(api_key):
+        return _INVALID
+    return _cached(hash_api_key(api_key))
+
+
+def _well_formed(api_key: str) -> bool:
+    if _key_re is None:
+        return bool(api_key)
+    return _key_re.fullmatch(api_key) is not None
+
+
+def _cached(h: str) -> Optional[APIKeyVerificationResponse]:
+    if _key_index is not None:
+        return _key_index.get(h, _INVALID)
+    if _key_bloom is not None and h not in _key_bloom:
+        return _INVALID
+    cached = _key_cache.get(h)
+    if cached is not None:
+        return cached
+    if h in _neg_cache:
+        return _INVALID
+    return None
+
+
 async def api_key_verification(api_key: str) -> APIKeyVerificationResponse:
     """
     Verifies the provided API key for authentication before allowing access to other endpoints.
@@ -25,11 +142,198 @@ async def api_key_verification(api_key: str) -> APIKeyVerificationResponse:
     Returns:
         APIKeyVerificationResponse: Outlines the response provided upon verifying an API key. It indicates whether the API key is valid and, if so, returns basic user information.
 
-    This function searches the User table in the database for the provided API key. If a matching API key is found, it checks the validity of the key and returns the user ID and role associated with the key. If the API key is not found or is invalid, it returns an invalid response.
+    Keys that are empty or do not match API_KEY_PATTERN are rejected outright. Otherwise this function consults short-lived in-process caches of recently verified and recently rejected keys. On a miss it searches the User table in the database for the SHA-256 digest of the provided API key; concurrent misses for the same key share a single query. If a matching API key is found, it caches and returns the user ID and role associated with the key. If the API key is not found or is invalid, it returns an invalid response.
+    """
+    if not _well_formed(api_key):
+        return _INVALID
+    h = hash_api_key(api_key)
+    cached = _cached(h)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(h)
+    if task is None:
+        task = asyncio.ensure_future(_lookup(h))
+        _inflight[h] = task
+        task.add_done_callback(lambda t: _lookup_done(h, t))
+    # Shielded so one caller going away does not cancel the lookup for the rest.
+    return await asyncio.shield(task)
+
+
+async def _lookup(h: str) -> APIKeyVerificationResponse:
+    """
+    Queries the User table for a key digest and records the outcome in the caches.
+    """
+    rows = await prisma.get_client().query_raw(_USER_BY_API_KEY_QUERY, h)
+    if rows:
+        user = rows[0]
+        res = APIKeyVerificationResponse(
+            is_valid=True, user_id=user["id"], role=user["role"]
+        )
+        _key_cache[h] = res
+        return res
+    _neg_cache[h] = True
+    return _INVALID
+
+
+async def api_key_verification_batch(
+    api_keys: list[str],
+) -> dict[str, APIKeyVerificationResponse]:
+    """
+    Verifies many API keys at once, e.g. when a gateway warms up or an admin tool audits keys.
+
+    Args:
+        api_keys (list[str]): The API keys to verify.
+
+    Returns:
+        dict[str, APIKeyVerificationResponse]: The verification result for each distinct key.
+
+    Keys already in the in-process caches are answered from memory. All remaining keys are resolved with a single query instead of one round-trip per key, and the outcomes are cached just like single-key lookups.
+    """
+    results: dict[str, APIKeyVerificationResponse] = {}
+    pending: dict[str, str] = {}
+    well_formed = []
+    for api_key in dict.fromkeys(api_keys):
+        if _well_formed(api_key):
+            well_formed.append(api_key)
+        else:
+            results[api_key] = _INVALID
+    # Hash every key in one comprehension: per-key overhead is the Python call
+    # into OpenSSL, not the digest itself.
+    sha256 = hashlib.sha256
+    digests = [sha256(api_key.encode()).hexdigest() for api_key in well_formed]
+    for api_key, h in zip(well_formed, digests):
+        cached = _cached(h)
+        if cached is not None:
+            results[api_key] = cached
+        else:
+            pending[h] = api_key
+
+    if pending:
+        pending_digests = list(pending)
+        rows = await prisma.get_client().query_raw(
+            _USERS_BY_API_KEYS_QUERY, pending_digests
+        )
+        for user in rows:
+            h = pending_digests[user["i"] - 1]
+            res = APIKeyVerificationResponse(
+                is_valid=True, user_id=user["id"], role=user["role"]
+            )
+            _key_cache[h] = res
+            results[pending.pop(h)] = res
+        for h, api_key in pending.items():
+            _neg_cache[h] = True
+            results[api_key] = _INVALID
+    return results
+
+
+def _lookup_done(h: str, task: "asyncio.Task[APIKeyVerificationResponse]") -> None:
+    _inflight.pop(h, None)
+    if not task.cancelled():
+        # Mark a failure as retrieved; any waiters still receive it when awaiting.
+        task.exception()
+
+
+async def refresh_api_key_index() -> int:
+    """
+    Reloads the in-memory mirror of every API key digest and its user.
+
+    Returns:
+        int: The number of keys now held in the index.
+
+    The new index is built off to the side and swapped in with a single assignment, so concurrent verifications always see either the old or the new table.
     """
-    user = await prisma.models.User.prisma().find_unique(where={"apiKey": api_key})
-    if user:
-        return APIKeyVerificationResponse(
-            is_valid=True, user_id=user.id, role=user.role
+    global _key_index
+    rows = await prisma.get_client().query_raw(_ALL_API_KEYS_QUERY)
+    _key_index = {
+        user["apiKeyHash"]: APIKeyVerificationResponse(
+            is_valid=True, user_id=user["id"], role=user["role"]
         )
-    return APIKeyVerificationResponse(is_valid=False, user_id=None, role=None)
+        for user in rows
+    }
+    return len(_key_index)
+
+
+async def refresh_api_key_bloom_filter() -> int:
+    """
+    Rebuilds the Bloom filter of every API key digest.
+
+    Returns:
+        int: The number of keys added to the filter.
+    """
+    global _key_bloom
+    rows = await prisma.get_client().query_raw(_ALL_API_KEY_HASHES_QUERY)
+    bloom = _BloomFilter(capacity=len(rows))
+    for user in rows:
+        bloom.add(user["apiKeyHash"])
+    _key_bloom = bloom
+    return len(rows)
+
+
+async def run_api_key_index_refresher(interval: float) -> None:
+    """
+    Keeps the in-memory API key index fresh until cancelled.
+
+    Args:
+        interval (float): Seconds to wait between reloads.
+
+    A failed reload is logged and the previous index stays in use until the next attempt.
+    """
+    await _run_periodically(refresh_api_key_index, interval, "API key index")
+
+
+async def run_api_key_bloom_refresher(interval: float) -> None:
+    """
+    Keeps the API key Bloom filter fresh until cancelled.
+
+    Args:
+        interval (float): Seconds to wait between rebuilds.
+
+    A failed rebuild is logged and the previous filter stays in use until the next attempt.
+    """
+    await _run_periodically(refresh_api_key_bloom_filter, interval, "API key Bloom filter")
+
+
+async def _run_periodically(
+    refresh: Callable[[], Awaitable[int]], interval: float, what: str
+) -> None:
+    while True:
+        try:
+            count = await refresh()
+            logger.debug("Loaded %d API keys into the %s", count, what)
+        except Exception:
+            logger.exception("Error refreshing the %s", what)
+        await asyncio.sleep(interval)
+
+
+class _BloomFilter:
+    """
+    Set membership over API key digests with no false negatives.
+
+    The digests are already uniformly distributed, so bit positions are derived from the digest itself by double hashing instead of hashing it again.
+    """
+
+    __slots__ = ("_bits", "_size", "_hashes")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self._size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, h: str) -> list[int]:
+        first = int(h[:16], 16)
+        step = int(h[16:32], 16) | 1
+        size = self._size
+        return [(first + i * step) % size for i in range(self._hashes)]
+
+    def add(self, h: str) -> None:
+        bits = self._bits
+        for pos in self._positions(h):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, h: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h))
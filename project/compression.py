@@ -0,0 +1,40 @@
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Media types that are already deflate-compressed; gzipping them again costs
+# CPU on every response for no saving.
+PRECOMPRESSED_MEDIA_TYPES = ("image/png", "image/webp")
+
+
+class ImageAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that sends PNG and WebP responses as they are.
+
+    It hooks into Starlette's GZipResponder.send_with_gzip, which is not a documented extension point; tests/test_compression.py fails if a Starlette upgrade stops calling it.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = _ImageAwareGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _ImageAwareGZipResponder(GZipResponder):
+    passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.passthrough = content_type.startswith(PRECOMPRESSED_MEDIA_TYPES)
+        if self.passthrough:
+            await self.send(message)
+        else:
+            await super().send_with_gzip(message)
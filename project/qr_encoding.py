@@ -0,0 +1,484 @@
+import functools
+import operator
+from bisect import bisect_left
+from itertools import zip_longest
+from typing import Callable, NamedTuple
+
+import qrcode
+from qrcode import LUT, base, exceptions, util
+
+
+class FastQRCode(qrcode.QRCode):
+    """
+    A QRCode whose encoding steps are replaced by faster equivalents: memoized mode selection, version fitting from segment lengths, an integer bit buffer, table-driven Reed-Solomon encoding, matrices assembled from a cached per-version layout and bit-parallel mask scoring.
+
+    Each replacement computes exactly what qrcode does, so every module has the same value as in qrcode.QRCode. The matrix rows are bytearrays of 0 and 1 rather than lists of bools; get_matrix returns them the same way.
+    """
+
+    # The layout of the current codewords, and the (version, codewords) it was
+    # made for.
+    _data_plane_key = None
+    _data_plane_cache = 0
+
+    def makeImpl(self, test, mask_pattern):
+        # makeImpl is called once per candidate mask; the codewords only need
+        # computing the first time, after which data_cache is reused.
+        if self.data_cache is None:
+            self.data_cache = create_data(
+                self.version, self.error_correction, self.data_list
+            )
+        version = self.version
+        n = version * 4 + 17
+        # The unmasked data and function patterns are laid out once per set
+        # of codewords; each mask and its format information then only cost
+        # an XOR and an OR over the whole matrix as one integer.
+        key = (version, self.data_cache)
+        if self._data_plane_key != key:
+            self._data_plane_cache = _data_plane(version, self.data_cache)
+            self._data_plane_key = key
+        plane = (
+            self._data_plane_cache ^ _mask_plane(version, mask_pattern)
+        ) | _info_plane(version, self.error_correction, mask_pattern, test)
+        flat = plane.to_bytes(n * n, "big")
+        self.modules_count = n
+        self.modules = [bytearray(flat[i : i + n]) for i in range(0, n * n, n)]
+
+    def get_matrix(self):
+        if self.data_cache is None:
+            self.make()
+        if not self.border:
+            return self.modules
+        width = len(self.modules) + self.border * 2
+        edge = [bytearray(width)] * self.border
+        side = bytearray(self.border)
+        return edge + [side + row + side for row in self.modules] + edge
+
+    def add_data(self, data, optimize=20):
+        if isinstance(data, util.QRData) or not optimize:
+            super().add_data(data, optimize)
+            return
+        self.data_list.extend(data_segments(util.to_bytestring(data), optimize))
+        self.data_cache = None
+
+    def best_fit(self, start=None):
+        # The payload length in bits follows from each segment's mode and
+        # length alone, so the smallest version is looked up in qrcode's
+        # capacity table without encoding the data into a BitBuffer first.
+        if start is None:
+            start = 1
+        util.check_version(start)
+        capacities = util.BIT_LIMIT_TABLE[self.error_correction]
+        while True:
+            mode_sizes = util.mode_sizes_for_version(start)
+            needed_bits = sum(
+                4 + mode_sizes[data.mode] + _segment_bits(data)
+                for data in self.data_list
+            )
+            version = bisect_left(capacities, needed_bits, start)
+            if version == 41:
+                raise exceptions.DataOverflowError()
+            # Larger versions use wider length fields; retry from there.
+            if util.mode_sizes_for_version(version) is mode_sizes:
+                break
+            start = version
+        self.version = version
+        return version
+
+    def best_mask_pattern(self):
+        min_lost_point = 0
+        pattern = 0
+        for i in range(8):
+            self.makeImpl(True, i)
+            points = lost_point(self.modules)
+            if i == 0 or min_lost_point > points:
+                min_lost_point = points
+                pattern = i
+        return pattern
+
+
+# Per-byte character classes for mode selection, indexing _CLASS_MODES.
+_MODE_CLASSES = bytes(
+    0 if b in b"0123456789" else 1 if b in util.ALPHA_NUM else 2 for b in range(256)
+)
+_CLASS_MODES = (util.MODE_NUMBER, util.MODE_ALPHA_NUM, util.MODE_8BIT_BYTE)
+# Folds the numeric class into the alphanumeric one, both becoming 0.
+_ALPHA_NUM_CLASSES = bytes((0, 0, 2)) + bytes(253)
+
+
+@functools.lru_cache(maxsize=1024)
+def data_segments(data: bytes, minimum: int = 20) -> tuple:
+    """
+    Splits content into QR data segments exactly as qrcode.util.optimal_data_chunks does.
+
+    Args:
+        data (bytes): The UTF-8 encoded content.
+        minimum (int): The shortest run of numeric or alphanumeric characters worth its own segment.
+
+    Returns:
+        tuple: The qrcode.util.QRData segments, shared between calls with the same content.
+
+    Every byte is classified in one bytes.translate pass. Content that needs a single segment, which is nearly all of it, is then settled by the highest class and two substring checks for long numeric or alphanumeric runs; only mixed content goes through qrcode's regex splitting.
+    """
+    short = len(data) <= minimum
+    # qrcode anchors short content with "$", which also matches before a
+    # trailing newline, so leave those to it along with empty content.
+    if not data or (short and data.endswith(b"\n")):
+        return tuple(util.optimal_data_chunks(data, minimum))
+    classes = data.translate(_MODE_CLASSES)
+    mode_class = max(classes)
+    if not short and mode_class:
+        run = bytes(minimum)
+        if run in classes or (
+            mode_class == 2 and run in classes.translate(_ALPHA_NUM_CLASSES)
+        ):
+            return tuple(util.optimal_data_chunks(data, minimum))
+    return (util.QRData(data, mode=_CLASS_MODES[mode_class], check_data=False),)
+
+
+def _segment_bits(data: util.QRData) -> int:
+    """
+    Returns how many bits a segment's characters take, excluding its mode and length headers.
+    """
+    n = len(data)
+    if data.mode == util.MODE_NUMBER:
+        return 10 * (n // 3) + util.NUMBER_LENGTH.get(n % 3, 0)
+    if data.mode == util.MODE_ALPHA_NUM:
+        return 11 * (n // 2) + 6 * (n % 2)
+    return 8 * n
+
+
+# Turns ASCII binary digits into 0/1 module bytes.
+_DIGITS_TO_MODULES = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class _Layout(NamedTuple):
+    size: int
+    # Every module of the finder, alignment and timing patterns, row by row,
+    # with 0 everywhere else.
+    blank: bytes
+    # The (row, col) of every data module, in placement order.
+    cells: tuple
+    # Picks the n * n modules, row by row, out of the placed data bits
+    # followed by a template for all other modules.
+    gather: Callable
+
+
+@functools.lru_cache(maxsize=None)
+def _layout(version: int) -> _Layout:
+    """
+    Works out, once per version, where everything in the module matrix goes.
+
+    Args:
+        version (int): The QR code version.
+
+    Returns:
+        _Layout: The function patterns, the data module placement path and the gather that assembles a matrix from them.
+
+    The patterns are drawn by qrcode's own setup methods on a scratch matrix, so they always match the library. Data modules are the ones still free once the format and version information areas are taken, walked in two-column zigzags from the bottom right as the standard prescribes.
+    """
+    n = version * 4 + 17
+    scratch = qrcode.QRCode(version=version)
+    scratch.modules_count = n
+    scratch.modules = [[None] * n for _ in range(n)]
+    scratch.setup_position_probe_pattern(0, 0)
+    scratch.setup_position_probe_pattern(n - 7, 0)
+    scratch.setup_position_probe_pattern(0, n - 7)
+    scratch.setup_position_adjust_pattern()
+    scratch.setup_timing_pattern()
+    blank = bytes(bool(module) for row in scratch.modules for module in row)
+    scratch.setup_type_info(True, 0)
+    if version >= 7:
+        scratch.setup_type_number(True)
+
+    cells = []
+    upward = True
+    for col in range(n - 1, 0, -2):
+        if col <= 6:
+            # Skip the vertical timing pattern.
+            col -= 1
+        rows = range(n - 1, -1, -1) if upward else range(n)
+        for row in rows:
+            for c in (col, col - 1):
+                if scratch.modules[row][c] is None:
+                    cells.append((row, c))
+        upward = not upward
+
+    count = len(cells)
+    sources = list(range(count, count + n * n))
+    for k, (row, col) in enumerate(cells):
+        sources[row * n + col] = k
+    return _Layout(n, blank, tuple(cells), operator.itemgetter(*sources))
+
+
+def _data_plane(version: int, data: bytes) -> int:
+    """
+    Lays out the unmasked codewords and the function patterns of a version.
+
+    Returns:
+        int: The module matrix, row by row with one byte per module, read as a big-endian integer. Format and version information modules are left light.
+    """
+    layout = _layout(version)
+    count = len(layout.cells)
+    extra = count - 8 * len(data)
+    bits = int.from_bytes(data, "big")
+    bits = bits << extra if extra >= 0 else bits >> -extra
+    return _place(layout, bits, layout.blank)
+
+
+@functools.lru_cache(maxsize=None)
+def _mask_plane(version: int, mask_pattern: int) -> int:
+    """
+    Evaluates a mask pattern over the data modules of a version.
+
+    Returns:
+        int: A matrix in the same form as _data_plane's, 1 where the mask inverts a data module and 0 everywhere else.
+
+    Each of the 8 patterns is only evaluated once per version, after which masking the data is a single XOR.
+    """
+    layout = _layout(version)
+    mask_func = util.mask_func(mask_pattern)
+    bits = int(
+        "".join("1" if mask_func(row, col) else "0" for row, col in layout.cells), 2
+    )
+    return _place(layout, bits, bytes(layout.size**2))
+
+
+@functools.lru_cache(maxsize=None)
+def _info_plane(
+    version: int, error_correction: int, mask_pattern: int, test: bool
+) -> int:
+    """
+    Returns the format and version information modules in the same form as _data_plane's, with every other module 0.
+
+    They are drawn by qrcode's own setup methods, which leave them all light while masks are being scored.
+    """
+    n = version * 4 + 17
+    scratch = qrcode.QRCode(version=version, error_correction=error_correction)
+    scratch.modules_count = n
+    scratch.modules = [[None] * n for _ in range(n)]
+    scratch.setup_type_info(test, mask_pattern)
+    if version >= 7:
+        scratch.setup_type_number(test)
+    return int.from_bytes(
+        bytes(bool(module) for row in scratch.modules for module in row), "big"
+    )
+
+
+def _place(layout: _Layout, bits: int, template: bytes) -> int:
+    count = len(layout.cells)
+    placed = format(bits, f"0{count}b").encode().translate(_DIGITS_TO_MODULES)
+    # Every module is picked from either the placed bits or the template in
+    # a single C-level gather.
+    return int.from_bytes(bytes(layout.gather(placed + template)), "big")
+
+
+class _BitBuffer:
+    """
+    Collects the encoded bit stream in a single integer, in place of qrcode.util.BitBuffer and its list of bytes built bit by bit.
+    """
+
+    __slots__ = ("value", "length")
+
+    def __init__(self):
+        self.value = 0
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def put(self, num: int, length: int) -> None:
+        self.value = (self.value << length) | (num & ((1 << length) - 1))
+        self.length += length
+
+    def put_bit(self, bit: bool) -> None:
+        self.value = (self.value << 1) | bool(bit)
+        self.length += 1
+
+
+def create_data(version: int, error_correction: int, data_list: list) -> bytes:
+    """
+    Encodes the segments of a QR code into its final interleaved codeword sequence.
+
+    Args:
+        version (int): The QR code version, 1 to 40.
+        error_correction (int): One of the qrcode.constants.ERROR_CORRECT_* levels.
+        data_list (list): The qrcode.util.QRData segments to encode.
+
+    Returns:
+        bytes: The data and error-correction codewords, in the order they are placed in the matrix.
+
+    The bit stream is assembled exactly as qrcode.util.create_data does, but in an integer, and the Reed-Solomon step is table-driven.
+    """
+    buffer = _BitBuffer()
+    for data in data_list:
+        buffer.put(data.mode, 4)
+        buffer.put(len(data), util.length_in_bits(data.mode, version))
+        data.write(buffer)
+
+    rs_blocks = base.rs_blocks(version, error_correction)
+    bit_limit = sum(block.data_count * 8 for block in rs_blocks)
+    if len(buffer) > bit_limit:
+        raise exceptions.DataOverflowError(
+            "Code length overflow. Data size (%s) > size available (%s)"
+            % (len(buffer), bit_limit)
+        )
+
+    # Terminator of up to four zero bits, then zero-fill to a byte boundary.
+    buffer.put(0, min(bit_limit - len(buffer), 4))
+    buffer.put(0, -len(buffer) % 8)
+
+    data = buffer.value.to_bytes(len(buffer) // 8, "big")
+    pad = bytes((util.PAD0, util.PAD1)) * (bit_limit // 16 + 1)
+    data += pad[: bit_limit // 8 - len(data)]
+    return create_bytes(data, rs_blocks)
+
+
+def create_bytes(data: bytes, rs_blocks: list) -> bytes:
+    """
+    Splits the data codewords into blocks, appends error correction to each and interleaves them.
+
+    Args:
+        data (bytes): The padded data codewords.
+        rs_blocks (list): The qrcode.base.RSBlock layout for the version and error-correction level.
+
+    Returns:
+        bytes: All data codewords interleaved across blocks, followed by all error-correction codewords interleaved the same way.
+    """
+    dc_blocks = []
+    ec_blocks = []
+    offset = 0
+    for rs_block in rs_blocks:
+        dc = data[offset : offset + rs_block.data_count]
+        offset += rs_block.data_count
+        dc_blocks.append(dc)
+        ec_blocks.append(rs_encode(dc, rs_block.total_count - rs_block.data_count))
+    return _interleave(dc_blocks) + _interleave(ec_blocks)
+
+
+def _interleave(blocks: list) -> bytes:
+    if len(blocks) == 1:
+        return bytes(blocks[0])
+    return bytes(
+        b for column in zip_longest(*blocks) for b in column if b is not None
+    )
+
+
+def rs_encode(data: bytes, ec_count: int) -> bytes:
+    """
+    Computes the Reed-Solomon error-correction codewords for one block.
+
+    Args:
+        data (bytes): The data codewords of the block.
+        ec_count (int): The number of error-correction codewords to produce.
+
+    Returns:
+        bytes: The remainder of data * x^ec_count divided by the generator polynomial.
+
+    The remainder register is held as a single integer of ec_count bytes. Each data byte then costs one table lookup plus a shift and two XORs, instead of ec_count GF(256) multiplications.
+    """
+    table = _rs_table(ec_count)
+    shift = 8 * (ec_count - 1)
+    mask = (1 << (8 * ec_count)) - 1
+    rem = 0
+    for byte in data:
+        rem = ((rem << 8) & mask) ^ table[(rem >> shift) ^ byte]
+    return rem.to_bytes(ec_count, "big")
+
+
+@functools.lru_cache(maxsize=None)
+def _rs_table(ec_count: int) -> tuple:
+    """
+    Returns, for every byte value f, the product f * g(x) without its leading term, packed big-endian into an integer.
+
+    Args:
+        ec_count (int): The degree of the generator polynomial g(x).
+
+    Returns:
+        tuple: 256 integers of ec_count bytes each.
+    """
+    if ec_count in LUT.rsPoly_LUT:
+        generator = LUT.rsPoly_LUT[ec_count]
+    else:
+        generator = [1]
+        for i in range(ec_count):
+            generator = (
+                base.Polynomial(generator, 0) * base.Polynomial([1, base.gexp(i)], 0)
+            ).num
+    log = base.LOG_TABLE
+    exp = base.EXP_TABLE
+    gen_logs = [log[c] for c in generator[1:]]
+    table = [0]
+    for f in range(1, 256):
+        lf = log[f]
+        table.append(
+            int.from_bytes(bytes(exp[(lf + lg) % 255] for lg in gen_logs), "big")
+        )
+    return tuple(table)
+
+
+# Turns a line of 0/1 module bytes into the ASCII digits int(..., 2) expects.
+_MODULES_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+# Finder-like 1:1:3:1:1 patterns with four light modules on one side, as
+# (offset, is_dark) pairs over an 11-module window.
+_FINDER_PATTERNS = tuple(
+    tuple(enumerate(int(bit) for bit in pattern))
+    for pattern in ("10111010000", "00001011101")
+)
+
+
+def lost_point(modules: list) -> int:
+    """
+    Scores a module matrix with the four mask penalty rules, exactly as qrcode.util.lost_point does.
+
+    Args:
+        modules (list): The square matrix of dark (True) and light (False) modules.
+
+    Returns:
+        int: The total penalty; the mask with the lowest one is used.
+
+    All rows are packed into one integer, one bit per module, with a zero gap bit between rows, and the columns into another. Each rule then becomes a handful of shifts, ANDs and popcounts over the whole matrix instead of a Python loop per module. The gap bit is light in the dark plane and masked out of the light plane, so no run or pattern is ever counted across two lines.
+    """
+    n = len(modules)
+    flat = b"".join(map(bytes, modules))
+    # The matrix is turned into digits once; both planes are sliced from it.
+    digits = flat.translate(_MODULES_TO_DIGITS)
+    valid = _valid_mask(n)
+    stride = n + 1
+
+    row_dark = int(b"0".join([digits[i : i + n] for i in range(0, n * n, n)]), 2)
+    row_light = ~row_dark & valid
+    col_dark = int(b"0".join([digits[c::n] for c in range(n)]), 2)
+    col_light = ~col_dark & valid
+
+    points = 0
+    for dark, light in ((row_dark, row_light), (col_dark, col_light)):
+        for plane in (dark, light):
+            # Rule 1: a run of L >= 5 same-coloured modules costs L - 2. It
+            # contains L - 4 windows of five and L - 5 windows of six, so the
+            # total is 3 * (windows of five) - 2 * (windows of six).
+            five = plane & plane >> 1 & plane >> 2 & plane >> 3 & plane >> 4
+            six = five & plane >> 5
+            points += 3 * five.bit_count() - 2 * six.bit_count()
+        # Rule 3: 40 for each finder-like pattern.
+        planes = (light, dark)
+        for pattern in _FINDER_PATTERNS:
+            found = valid
+            for offset, is_dark in pattern:
+                found &= planes[is_dark] >> offset
+            points += 40 * found.bit_count()
+
+    # Rule 2: 3 for each 2x2 block of one colour.
+    for plane in (row_dark, row_light):
+        block = plane & plane >> 1 & plane >> stride & plane >> (stride + 1)
+        points += 3 * block.bit_count()
+
+    # Rule 4: 10 for every 5% the dark share departs from 50%.
+    percent = float(flat.count(1)) / (n**2)
+    points += int(abs(percent * 100 - 50) / 5) * 10
+    return points
+
+
+@functools.lru_cache(maxsize=None)
+def _valid_mask(n: int) -> int:
+    return int(b"0".join([b"1" * n] * n), 2)
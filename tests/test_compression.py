@@ -0,0 +1,53 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from project.compression import ImageAwareGZipMiddleware
+
+# Compressible, and comfortably over the middleware's 512-byte minimum.
+_BODY = b"0123456789abcdef" * 128
+
+app = FastAPI()
+app.add_middleware(ImageAwareGZipMiddleware, minimum_size=512, compresslevel=1)
+
+
+@app.get("/body")
+def body(media_type: str) -> Response:
+    return Response(content=_BODY, media_type=media_type)
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("media_type", ["image/png", "image/webp"])
+def test_precompressed_images_are_sent_as_is(media_type):
+    res = client.get(
+        "/body", params={"media_type": media_type}, headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert "content-encoding" not in res.headers
+    assert res.headers["content-length"] == str(len(_BODY))
+    assert res.content == _BODY
+
+
+@pytest.mark.parametrize("media_type", ["application/json", "image/svg+xml"])
+def test_other_responses_are_gzipped(media_type):
+    res = client.get(
+        "/body", params={"media_type": media_type}, headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert res.headers["content-encoding"] == "gzip"
+    assert int(res.headers["content-length"]) < len(_BODY)
+    assert res.content == _BODY
+
+
+def test_clients_without_gzip_get_plain_responses():
+    res = client.get(
+        "/body",
+        params={"media_type": "application/json"},
+        headers={"Accept-Encoding": "identity"},
+    )
+
+    assert "content-encoding" not in res.headers
+    assert res.content == _BODY
@@ -0,0 +1,130 @@
+import random
+
+import pytest
+import qrcode
+from qrcode import util
+
+from project.qr_encoding import FastQRCode, create_data, lost_point
+
+LEVELS = [
+    qrcode.constants.ERROR_CORRECT_L,
+    qrcode.constants.ERROR_CORRECT_M,
+    qrcode.constants.ERROR_CORRECT_Q,
+    qrcode.constants.ERROR_CORRECT_H,
+]
+
+# Payload bits per character in each mode, used to size content that fills
+# most of a version without overflowing it.
+_BITS_PER_CHAR = {"numeric": 10 / 3, "alphanumeric": 11 / 2, "byte": 8, "mixed": 8}
+
+
+def _content(mode: str, version: int, level: int, rng: random.Random) -> str:
+    capacity = util.BIT_LIMIT_TABLE[level][version] - 40
+    length = max(1, int(capacity * 0.8 / _BITS_PER_CHAR[mode]))
+    if mode == "numeric":
+        return "".join(rng.choice("0123456789") for _ in range(length))
+    if mode == "alphanumeric":
+        return "".join(rng.choice(util.ALPHA_NUM.decode()) for _ in range(length))
+    if mode == "byte":
+        letters = "abcdefghijklmnopqrstuvwxyz/.?=&"
+        return "".join(rng.choice(letters) for _ in range(length))
+    # Runs long enough for the optimizer to switch modes, then plain text.
+    parts = []
+    while sum(map(len, parts)) < length:
+        parts.append(
+            rng.choice(["0123456789" * 3, "HTTPS://EXAMPLE.COM/", "path?q=1&x=", "été"])
+        )
+    return "".join(parts)[:length]
+
+
+def _matrix(qr: qrcode.QRCode) -> list:
+    return [[bool(module) for module in row] for row in qr.get_matrix()]
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize("version", range(1, 41))
+def test_matrix_matches_qrcode_for_every_version(version, level):
+    rng = random.Random(version * 4 + level)
+    mode = list(_BITS_PER_CHAR)[(version + level) % 4]
+    content = _content(mode, version, level, rng)
+
+    expected = qrcode.QRCode(version=version, error_correction=level)
+    expected.add_data(content)
+    expected.make(fit=False)
+    actual = FastQRCode(version=version, error_correction=level)
+    actual.add_data(content)
+    actual.make(fit=False)
+
+    assert _matrix(actual) == _matrix(expected)
+
+
+@pytest.mark.parametrize("level", LEVELS)
+@pytest.mark.parametrize(
+    "content",
+    [
+        "https://example.com",
+        "1234567890" * 12,
+        "HELLO WORLD 42",
+        "MIXED 0123456789012345678901234 content\nwith a newline",
+        "ünicöde ✓",
+        "x" * 700,
+    ],
+)
+def test_fitted_matrix_matches_qrcode(content, level):
+    expected = qrcode.QRCode(error_correction=level)
+    expected.add_data(content)
+    expected.make()
+    actual = FastQRCode(error_correction=level)
+    actual.add_data(content)
+    actual.make()
+
+    assert actual.version == expected.version
+    assert _matrix(actual) == _matrix(expected)
+
+
+@pytest.mark.parametrize("mask_pattern", range(8))
+def test_fixed_mask_matches_qrcode(mask_pattern):
+    expected = qrcode.QRCode(version=7, mask_pattern=mask_pattern)
+    expected.add_data("fixed mask")
+    expected.make(fit=False)
+    actual = FastQRCode(version=7, mask_pattern=mask_pattern)
+    actual.add_data("fixed mask")
+    actual.make(fit=False)
+
+    assert _matrix(actual) == _matrix(expected)
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_create_data_matches_qrcode(level):
+    rng = random.Random(level)
+    for version in range(1, 41):
+        data_list = [util.QRData(rng.randbytes(rng.randrange(1, 8)))]
+        assert list(create_data(version, level, data_list)) == util.create_data(
+            version, level, data_list
+        )
+
+
+def test_overflow_raises():
+    qr = FastQRCode(error_correction=qrcode.constants.ERROR_CORRECT_H)
+    qr.add_data("x" * 3000)
+    with pytest.raises(qrcode.exceptions.DataOverflowError):
+        qr.make()
+
+
+@pytest.mark.parametrize("size", [21, 25, 45, 57, 101, 177])
+def test_lost_point_matches_qrcode_on_random_matrices(size):
+    rng = random.Random(size)
+    for density in (0.1, 0.5, 0.9):
+        modules = [[rng.random() < density for _ in range(size)] for _ in range(size)]
+        assert lost_point(modules) == util.lost_point(modules)
+
+
+def test_lost_point_matches_qrcode_on_qr_matrices():
+    for version in (1, 6, 7, 20):
+        qr = FastQRCode(version=version)
+        qr.add_data("lost point")
+        qr.make(fit=False)
+        for mask_pattern in range(8):
+            qr.makeImpl(True, mask_pattern)
+            modules = [[bool(module) for module in row] for row in qr.modules]
+            assert lost_point(qr.modules) == util.lost_point(modules)